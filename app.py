@@ -1,9 +1,17 @@
 import streamlit as st
 from pathlib import Path
 import pandas as pd
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
+import plotly.io as pio
+import altair as alt
 import os
+import calendar
+import functools
+from concurrent.futures import ThreadPoolExecutor
+import pyarrow as pa
+import pyarrow.csv as pacsv
 
 # === CONFIGURAÇÃO SEGURA PARA STREAMLIT CLOUD ===
 if 'STREAMLIT_CLOUD' in os.environ:
@@ -20,7 +28,6 @@ from etl import (
     create_distance_over_time, 
     create_activity_type_pie,
     create_pace_trend,
-    create_monthly_stats,
     filter_by_date,    # <--- adicionada
 )
 
@@ -29,6 +36,16 @@ STRAVA_ORANGE = '#FC4C02'
 LINE_COLOR = 'white'
 # ==========================================
 
+# template Plotly compartilhado: validado uma vez, herdado por todas as figuras.
+# Empilhado sobre o template "streamlit" (tema do app); margens ficam no layout de cada
+# figura, porque o tema do Streamlit sobrescreve margin l/r do template no navegador
+pio.templates["strava"] = go.layout.Template(layout=dict(
+    colorway=[STRAVA_ORANGE, "#FF7F50", "#FFD700", "#A0522D"],
+    xaxis=dict(automargin=True),
+    yaxis=dict(automargin=True),
+))
+pio.templates.default = "streamlit+strava"
+
 # === HELPER FUNCTIONS ===
 
 def format_pace_minutes(pace_min):
@@ -40,6 +57,15 @@ def format_pace_minutes(pace_min):
     secs = int(round((pace_min - mins) * 60))
     return f"{mins}:{secs:02d}"
 
+def format_pace_minutes_array(pace_arr):
+    """Versão vetorizada de format_pace_minutes: lista de MM:SS ("N/A" para NaN/0)"""
+    pace_arr = np.round(np.asarray(pace_arr, dtype=np.float64), 1)
+    valid = np.isfinite(pace_arr) & (pace_arr != 0)
+    safe = np.where(valid, pace_arr, 0.0)
+    mins = safe.astype(np.int64)
+    secs = np.rint((safe - mins) * 60).astype(np.int64)
+    return [f"{m}:{sec:02d}" if ok else "N/A" for m, sec, ok in zip(mins, secs, valid)]
+
 def format_minutes_hms(total_min):
     """Formata minutos para HH:MM:SS"""
     if pd.isna(total_min) or total_min == 0:
@@ -51,6 +77,10 @@ def format_minutes_hms(total_min):
     secs = total_seconds % 60
     return f"{hrs}:{mins:02d}:{secs:02d}"
 
+# faixas usadas por categorize_distance (versão vetorizada com pd.cut)
+_DIST_BINS = np.array([-np.inf, 5, 10, 21, np.inf])
+_DIST_LABELS = ["Treino leve (< 5km)", "Curta (5-10km)", "Médio (10-21km)", "Meia maratona (> 21km)"]
+
 def categorize_distance(distance_km):
     """Categoriza a corrida por distância"""
     if distance_km < 5:
@@ -62,43 +92,92 @@ def categorize_distance(distance_km):
     else:
         return "Meia maratona (> 21km)"
 
+# Cores por tipo (adapte se seus tipos forem diferentes)
+_PREFERRED_COLORS = {
+    "Run": "#FC4C02",        # laranja Strava
+    "Ride": "#1f77b4",       # azul
+    "Bike": "#17becf",       # ajustar bike para cor distinta
+    "Walk": "#2ca02c",       # verde
+    "Hike": "#8c564b",       # marrom
+    "VirtualRun": "#9467bd",
+    "EBikeRide": "#7f7f7f"
+}
+# Palette fallback para tipos não mapeados
+_FALLBACK_PALETTE = ("#e377c2", "#bcbd22", "#ff7f0e", "#17becf")
+
+_MONTH_MAP = {1:"Jan",2:"Fev",3:"Mar",4:"Abr",5:"Mai",6:"Jun",7:"Jul",8:"Ago",9:"Set",10:"Out",11:"Nov",12:"Dez"}
+
+# cores da pizza de tipos de atividade
+_PIE_TYPE_COLORS = {
+    "Run": "#FC4C02",
+    "Walk": "#2ca02c",
+    "Ride": "#1f77b4",
+}
+
+@functools.lru_cache(maxsize=8)
+def _pie_colors_for(labels):
+    """Lista de cores na ordem das fatias; só recalcula quando o conjunto de tipos muda"""
+    return tuple(_PIE_TYPE_COLORS.get(lbl, "#A0522D") for lbl in labels)
+
+@functools.lru_cache(maxsize=16)
+def _color_map_for_types(types):
+    """Mapa tipo -> cor; o conjunto de tipos raramente muda entre filtros, então fica em cache"""
+    return {t: _PREFERRED_COLORS.get(t, _FALLBACK_PALETTE[i % len(_FALLBACK_PALETTE)])
+            for i, t in enumerate(sorted(types, key=str))}
+
+# acima disso o scatter é rasterizado com Datashader
+DATASHADER_THRESHOLD = 20_000
+
+def _rasterized_runs_by_km(df_in, color_map):
+    """Imagem agregada (Datashader) de distância x duração"""
+    # import tardio: datashader carrega numba, só vale a pena para históricos grandes
+    import datashader as ds
+    import datashader.transfer_functions as tf
+
+    df_ds = df_in[["distance_km", "duration_min", "type"]].reset_index(drop=True)
+    df_ds = df_ds.assign(type=df_ds["type"].astype("category"))
+    color_key = {t: color_map.get(t, "#A0522D") for t in df_ds["type"].cat.categories}
+
+    cvs = ds.Canvas(plot_width=800, plot_height=400)
+    agg = cvs.points(df_ds, "distance_km", "duration_min", ds.count_cat("type"))
+    img = tf.shade(agg, color_key=color_key)
+    # uint32 RGBA -> (altura, largura, 4); linha 0 = menor duração, daí origin="lower"
+    rgba = img.to_numpy().view(np.uint8).reshape(img.shape + (4,))
+    fig = px.imshow(
+        rgba,
+        x=agg.coords["distance_km"].to_numpy(),
+        y=agg.coords["duration_min"].to_numpy(),
+        origin="lower",
+        title="Distribuição de corridas por distância",
+        labels={"x": "Distância (km)", "y": "Duração (min)"},
+    )
+    fig.update_layout(xaxis_title=None)
+    return fig
+
 def total_runs_by_km(df_in):
     """Gráfico de dispersão: total corridas por km (cores por tipo de atividade)"""
     if df_in.empty:
         return None
-    df_in = df_in.copy()
-    df_in["distance_km"] = pd.to_numeric(df_in["distance_km"], errors="coerce").fillna(0)
-    df_in["duration_min"] = pd.to_numeric(df_in["duration_min"], errors="coerce").fillna(0)
-
-    # Cores por tipo (adapte se seus tipos forem diferentes)
-    preferred = {
-        "Run": "#FC4C02",        # laranja Strava
-        "Ride": "#1f77b4",       # azul
-        "Bike": "#17becf",       # ajustar bike para cor distinta
-        "Walk": "#2ca02c",       # verde
-        "Hike": "#8c564b",       # marrom
-        "VirtualRun": "#9467bd",
-        "EBikeRide": "#7f7f7f"
-    }
+    # distance_km / duration_min já chegam numéricos e sem NaN (ver _clean)
+
+    color_map = _color_map_for_types(tuple(df_in["type"].dropna().unique()))
 
-    unique_types = [t for t in df_in["type"].dropna().unique()]
-    # Palette fallback para tipos não mapeados
-    fallback_palette = ["#e377c2", "#bcbd22", "#ff7f0e", "#17becf"]
-    color_map = {}
-    for i, t in enumerate(sorted(unique_types, key=lambda x: str(x))):
-        color_map[t] = preferred.get(t, fallback_palette[i % len(fallback_palette)])
+    # muitos pontos viram "borrão" no scatter: rasteriza numa imagem de resolução fixa
+    if len(df_in) > DATASHADER_THRESHOLD:
+        return _rasterized_runs_by_km(df_in, color_map)
 
     fig = px.scatter(
         df_in,
         x="distance_km",
-        y="distance_km",
+        y="duration_min",
         size="duration_min",
         color="type",
         hover_name="name",
         title="Distribuição de corridas por distância",
-        labels={"distance_km": "Distância (km)"},
+        labels={"distance_km": "Distância (km)", "duration_min": "Duração (min)"},
         trendline=None,
-        color_discrete_map=color_map
+        color_discrete_map=color_map,
+        render_mode="webgl",  # WebGL: um draw call em vez de um nó SVG por ponto
     )
 
     # garantir sem título no eixo X (não forçar centralização)
@@ -106,32 +185,74 @@ def total_runs_by_km(df_in):
     return fig
 
 def pace_by_category(df_in):
-    """Gráfico de barras: pace médio por categoria"""
+    """Tabela: pace médio por categoria de distância (com rótulo MM:SS)"""
     if df_in.empty:
         return None
-    df_in = df_in.copy()
-    df_in["distance_km"] = pd.to_numeric(df_in["distance_km"], errors="coerce").fillna(0)
-    df_in["duration_min"] = pd.to_numeric(df_in["duration_min"], errors="coerce").fillna(0)
-    df_in["category"] = df_in["distance_km"].apply(categorize_distance)
-    df_in["pace_min_km"] = df_in.apply(
-        lambda row: row["duration_min"] / row["distance_km"] if row["distance_km"] > 0 else pd.NA,
-        axis=1
-    )
-    df_in["pace_min_km"] = pd.to_numeric(df_in["pace_min_km"], errors="coerce")
-    df_in["pace_min_km"] = df_in["pace_min_km"].round(1)
-    cat_pace = df_in.groupby("category")["pace_min_km"].mean().reset_index()
+    # _category / _pace vêm prontos de _clean: aqui só a agregação do recorte
+    cat_pace = (df_in.groupby("_category", observed=True)["_pace"].mean()
+                .rename_axis("category").reset_index(name="pace_min_km"))
     cat_pace = cat_pace.sort_values("pace_min_km")
     cat_pace = cat_pace.dropna(subset=["pace_min_km"])
     if cat_pace.empty:
         return None
-    fig = px.bar(cat_pace, x="category", y="pace_min_km",
-                 title="Pace médio por categoria de distância",
-                 labels={"category":"Categoria","pace_min_km":"Pace (min/km)"},
-                 text=cat_pace["pace_min_km"].apply(lambda x: format_pace_minutes(x)),
-                 color_discrete_sequence=["#FC4C02"])
-    fig.update_traces(textposition="outside")
-    fig.update_layout(xaxis_tickangle=-45, xaxis_title=None)
-    return fig
+    cat_pace["label"] = format_pace_minutes_array(cat_pace["pace_min_km"].to_numpy())
+    return cat_pace
+
+def monthly_distance(df_in):
+    """Tabela: distância total (km) por mês, em ordem cronológica"""
+    if df_in.empty:
+        return None
+    # código inteiro do mês (ano * 12 + mês) a partir de _year/_month de _clean;
+    # np.bincount soma as distâncias por mês numa única passada, sem o groupby do pandas
+    codes = df_in["_year"].to_numpy(dtype=np.int64) * 12 + df_in["_month"].to_numpy(dtype=np.int64) - 1
+    base = codes.min()
+    totals = np.bincount(codes - base, weights=df_in["distance_km"].to_numpy(dtype=np.float64))
+    present = np.flatnonzero(np.bincount(codes - base))  # só meses com atividade
+    years, months = np.divmod(present + base, 12)
+    distance = np.round(totals[present], 1)
+    return pd.DataFrame({
+        "month_year": [f"{y}-{m + 1:02d}" for y, m in zip(years, months)],
+        "distance_km": distance,
+        "label": [f"{d:.1f}" for d in distance],
+    })
+
+def labeled_bar_chart(data, x, y, title, height=540):
+    """Barras Vega-Lite (Altair) com o valor escrito sobre cada barra e sem eixo Y"""
+    base = alt.Chart(data).encode(
+        x=alt.X(f"{x}:N", sort=None, title=None, axis=alt.Axis(labelAngle=-45)),
+        y=alt.Y(f"{y}:Q", axis=None),
+    )
+    bars = base.mark_bar(color=STRAVA_ORANGE)
+    labels = base.mark_text(baseline="bottom", dy=-4).encode(text="label:N")
+    return (bars + labels).properties(title=title, height=height)
+
+def _apply_date_filters(df_in, year=None, month=None, day=None):
+    """Filtra por ano / mês / dia usando o índice de datas ordenado (busca binária)"""
+    if year is not None and (day is None or month is not None):
+        # ano [/ mês [/ dia]] é um intervalo contínuo: fatia direto pelo índice
+        if month is None:
+            key = f"{year}"
+        elif day is None:
+            key = f"{year}-{month:02d}"
+        else:
+            if not 1 <= day <= calendar.monthrange(year, month)[1]:
+                # dia inexistente no mês (ex.: 30/02): nenhuma atividade
+                return df_in.iloc[0:0]
+            key = f"{year}-{month:02d}-{day:02d}"
+        return df_in.loc[key:key]
+
+    # combinações que não formam um intervalo (ex.: mês sem ano) usam os filtros por componente,
+    # combinados numa única máscara; sem filtro nenhum devolve o próprio df_in (sem cópia)
+    conds = []
+    if year is not None:
+        conds.append(df_in["_year"].to_numpy() == year)
+    if month is not None:
+        conds.append(df_in["_month"].to_numpy() == month)
+    if day is not None:
+        conds.append(df_in["_day"].to_numpy() == day)
+    if not conds:
+        return df_in
+    return df_in.iloc[np.flatnonzero(np.logical_and.reduce(conds))]
 
 # === CONFIGURAÇÃO INICIAL ===
 st.set_page_config(page_title="Dashboard Strava", layout="wide")
@@ -180,6 +301,203 @@ def load_cached_activities(per_page: int, max_pages: int) -> pd.DataFrame:
     """Função para buscar dados do Strava, usa cache do Streamlit."""
     return load_activities(per_page=per_page, max_pages=max_pages)
 
+# nomes possíveis da coluna de data no CSV (em ordem de preferência)
+DATE_COLUMNS = ("date", "start_date", "start_date_local")
+# colunas auxiliares criadas em _clean (não vão para o CSV baixado)
+AUX_COLUMNS = ["_year", "_month", "_day", "_pace", "_category"]
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _load_csv(path: str, mtime: float) -> pd.DataFrame:
+    """Lê o CSV já convertendo a coluna de data; mtime invalida o cache quando o arquivo muda."""
+    head = pd.read_csv(path, nrows=0).columns
+    date_col = next((c for c in DATE_COLUMNS if c in head), None)
+    parse_dates = [date_col] if date_col else None
+    # leitor multi-thread do Arrow; colunas ficam com dtypes Arrow (strings compactas)
+    try:
+        return pd.read_csv(path, engine="pyarrow", dtype_backend="pyarrow", parse_dates=parse_dates)
+    except (pa.ArrowInvalid, ValueError):
+        pass  # CSV / opção que o Arrow não lê (o pandas converte para ParserError): cai no engine C padrão
+    return pd.read_csv(path, parse_dates=parse_dates)
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _clean(df_raw: pd.DataFrame, date_col: str) -> pd.DataFrame:
+    """Normaliza colunas (data, distância, duração, tipo) e remove linhas inválidas."""
+    df = df_raw.copy()
+
+    # read_csv já faz o parse; só converte se sobrou texto (datas inválidas viram NaT)
+    if not pd.api.types.is_datetime64_any_dtype(df[date_col]):
+        df[date_col] = pd.to_datetime(df[date_col], errors='coerce')
+    elif isinstance(df[date_col].dtype, pd.ArrowDtype):
+        # timestamp Arrow -> datetime64 do NumPy (índice de datas e Plotly)
+        df[date_col] = pd.DatetimeIndex(df[date_col])
+    df = df.rename(columns={date_col: "date"})
+
+    # Verificar coluna de distância
+    if "distance_km" not in df.columns:
+        for col in ["distance", "distance_km"]:
+            if col in df.columns:
+                df["distance_km"] = pd.to_numeric(df[col], errors="coerce")
+                if col == "distance":  # Se for em metros, converter para km
+                    df["distance_km"] = df["distance_km"] / 1000
+                break
+
+    # Verificar coluna de duração
+    if "duration_min" not in df.columns:
+        for col in ["moving_time", "elapsed_time", "duration"]:
+            if col in df.columns:
+                # Converter segundos para minutos
+                df["duration_min"] = pd.to_numeric(df[col], errors="coerce") / 60
+                break
+
+    # Verificar coluna de tipo
+    if "type" not in df.columns:
+        for col in ["sport_type", "type", "activity_type"]:
+            if col in df.columns:
+                df["type"] = df[col]
+                break
+
+    # Remover linhas com dados essenciais faltando
+    df = df.dropna(subset=['date'])
+    if "distance_km" in df.columns:
+        df = df[df["distance_km"] > 0]
+    if "duration_min" in df.columns:
+        df = df[df["duration_min"] > 0]
+
+    # tipos mais compactos: float32 nas medidas, categoria no tipo de atividade
+    for col in ("distance_km", "duration_min"):
+        if col in df.columns:
+            df[col] = df[col].astype("float32")
+    # demais numéricas (elevação, velocidades, kudos...) no menor tipo que cabe:
+    # menos bytes no JSON do Plotly e no CSV baixado
+    for col in df.select_dtypes("float").columns.difference(["distance_km", "duration_min"]):
+        df[col] = pd.to_numeric(df[col], downcast="float")
+    for col in df.select_dtypes("integer").columns:
+        df[col] = pd.to_numeric(df[col], downcast="integer")
+    if "type" in df.columns:
+        df["type"] = df["type"].astype("category")
+    if "name" in df.columns:
+        df["name"] = df["name"].astype("string[pyarrow]")
+
+    # ano / mês / dia calculados uma vez (sidebar e filtros reaproveitam)
+    df["_year"] = df["date"].dt.year.astype("int16")
+    df["_month"] = df["date"].dt.month.astype("int8")
+    df["_day"] = df["date"].dt.day.astype("int8")
+
+    # pace e categoria de distância por atividade, calculados uma vez no carregamento
+    # (pace_by_category só agrega estas colunas a cada filtro)
+    if "distance_km" in df.columns and "duration_min" in df.columns:
+        dist = df["distance_km"].to_numpy(dtype=np.float64)
+        dur = df["duration_min"].to_numpy(dtype=np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            df["_pace"] = np.round(np.where(dist > 0, dur / dist, np.nan), 1).astype("float32")
+        # right=False mantém os limites de categorize_distance (ex.: 5km -> "Curta")
+        df["_category"] = pd.cut(df["distance_km"], bins=_DIST_BINS, labels=_DIST_LABELS, right=False)
+
+    # índice de datas ordenado permite filtrar por fatias (.loc) em vez de máscaras;
+    # o índice fica sem nome para não ficar ambíguo com a coluna "date"
+    df = df.sort_values("date")
+    df.index = pd.DatetimeIndex(df["date"]).rename(None)
+    # extremos do período guardados uma vez (já ordenado: primeira e última linha);
+    # como texto, para os attrs continuarem serializáveis quando o Streamlit converte o frame
+    if not df.empty:
+        df.attrs["date_min"] = df["date"].iat[0].strftime('%Y-%m-%d')
+        df.attrs["date_max"] = df["date"].iat[-1].strftime('%Y-%m-%d')
+    return df
+
+def _df_fingerprint(d: pd.DataFrame):
+    """Identifica o DataFrame filtrado sem hashear todas as colunas (formato + hash do índice + soma)"""
+    if d.empty:
+        return (0,)
+    # hash vetorizado só do índice de datas: distingue recortes com mesmo tamanho e extremos
+    index_hash = int(pd.util.hash_pandas_object(d.index, index=False).sum())
+    return (d.shape, index_hash, float(d["distance_km"].sum()))
+
+# cache dos gráficos: mesma seleção de filtros devolve a figura pronta
+_CHART_CACHE = dict(ttl=600, show_spinner=False, max_entries=32, hash_funcs={pd.DataFrame: _df_fingerprint})
+
+def _styled_dict(fig, layout, marker=None, line=None):
+    """Converte a figura em dict e aplica layout / cores direto no dict.
+
+    Evita os update_layout/update_traces do graph_objects, que revalidam a figura a cada chamada;
+    st.plotly_chart aceita o dict diretamente."""
+    d = fig.to_dict()
+    fig_layout = d["layout"]
+    for key, value in layout.items():
+        if isinstance(value, dict) and isinstance(fig_layout.get(key), dict):
+            fig_layout[key].update(value)
+        else:
+            fig_layout[key] = value
+    # sem título no eixo X em nenhum gráfico
+    fig_layout.get("xaxis", {}).pop("title", None)
+    for trace in d["data"]:
+        if marker:
+            trace.setdefault("marker", {}).update(marker)
+        if line:
+            trace.setdefault("line", {}).update(line)
+    return d
+
+@st.cache_data(**_CHART_CACHE)
+def _cached_distance_over_time(df_in):
+    fig = create_distance_over_time(df_in)
+    if fig is None:
+        return None
+    # título com ícone substitui o título vindo do etl.py
+    return _styled_dict(fig, {"title": {"text": "🏃 Distância acumulada"},
+                              "margin": dict(t=40, b=60, l=40, r=20), "height": 420},
+                        marker={"color": "#FC4C02"}, line={"color": "#FC4C02"})
+
+@st.cache_data(**_CHART_CACHE)
+def _cached_pace_trend(df_in):
+    fig = create_pace_trend(df_in)
+    if fig is None:
+        return None
+    return _styled_dict(fig, {"title": {"text": "🏃 Tendência de pace"},
+                              "margin": dict(t=40, b=60, l=40, r=20), "height": 420},
+                        marker={"color": "#FC4C02"}, line={"color": "#FC4C02"})
+
+@st.cache_data(**_CHART_CACHE)
+def _cached_activity_type_pie(df_in):
+    fig = create_activity_type_pie(df_in)
+    if fig is None:
+        return None
+    colors = _pie_colors_for(tuple(fig.data[0].labels))
+    return _styled_dict(fig, {"title": {"text": "🏃 Tipos de atividade"},
+                              "margin": dict(t=40, b=60, l=40, r=20), "height": 420},
+                        marker={"colors": list(colors)})
+
+@st.cache_data(**_CHART_CACHE)
+def _cached_runs_by_km(df_in):
+    fig = total_runs_by_km(df_in)
+    if fig is None:
+        return None
+    return _styled_dict(fig, {"title": {"text": "🏃 Distribuição por distância"},
+                              "margin": dict(t=40, b=60, l=40, r=20), "height": 460})
+
+@st.cache_data(**_CHART_CACHE)
+def _cached_monthly_distance(df_in):
+    return monthly_distance(df_in)
+
+@st.cache_data(**_CHART_CACHE)
+def _cached_pace_by_category(df_in):
+    return pace_by_category(df_in)
+
+@st.cache_data(ttl=300, show_spinner=False, max_entries=8, hash_funcs={pd.DataFrame: _df_fingerprint})
+def _csv_bytes(df_in: pd.DataFrame) -> bytes:
+    """CSV do recorte filtrado (sem colunas auxiliares), serializado uma vez por seleção"""
+    df_out = df_in.drop(columns=AUX_COLUMNS, errors="ignore")
+    # writer C++ do Arrow grava UTF-8 direto num buffer (sem str intermediária + encode)
+    # datas no mesmo formato do to_csv ("2025-01-31 07:00:00+00:00"; o Arrow usaria "...Z")
+    dt_cols = df_out.select_dtypes(include=["datetime", "datetimetz"]).columns
+    if len(dt_cols):
+        df_out = df_out.assign(**{c: df_out[c].astype(str).where(df_out[c].notna()) for c in dt_cols})
+    try:
+        buf = pa.BufferOutputStream()
+        pacsv.write_csv(pa.Table.from_pandas(df_out, preserve_index=False), buf)
+        return buf.getvalue().to_pybytes()
+    except pa.ArrowException:
+        pass  # coluna sem conversão / escrita no Arrow (ex.: object com tipos mistos): cai no to_csv do pandas
+    return df_out.to_csv(index=False).encode("utf-8")
+
 # -- Removido bloco sidebar duplicado aqui para evitar StreamlitDuplicateElementId --
 # (A barra lateral com filtros é definida mais abaixo, após o carregamento dos dados.)
 
@@ -188,7 +506,7 @@ btn_fetch = False  # Inicializa como False para evitar erro de referência antes
 try:
     csv_path = OUT_DIR / "activities.csv"
     if csv_path.exists():
-        df = pd.read_csv(csv_path) 
+        df = _load_csv(str(csv_path), csv_path.stat().st_mtime)
         st.info(f"Carregado CSV local: {csv_path.name}")
     else:
         df = pd.DataFrame()
@@ -204,7 +522,7 @@ if df.empty:
 # === TRATAMENTO DE COLUNAS ===
 # Verificar coluna de data
 date_col = None
-for col in ["date", "start_date", "start_date_local"]:
+for col in DATE_COLUMNS:
     if col in df.columns:
         date_col = col
         break
@@ -213,39 +531,8 @@ if not date_col:
     st.error("❌ Nenhuma coluna de data encontrada")
     st.stop()
 
-df[date_col] = pd.to_datetime(df[date_col], errors='coerce')
-df = df.rename(columns={date_col: "date"})
-
-# Verificar coluna de distância
-if "distance_km" not in df.columns:
-    for col in ["distance", "distance_km"]:
-        if col in df.columns:
-            df["distance_km"] = pd.to_numeric(df[col], errors="coerce")
-            if col == "distance":  # Se for em metros, converter para km
-                df["distance_km"] = df["distance_km"] / 1000
-            break
-
-# Verificar coluna de duração
-if "duration_min" not in df.columns:
-    for col in ["moving_time", "elapsed_time", "duration"]:
-        if col in df.columns:
-            # Converter segundos para minutos
-            df["duration_min"] = pd.to_numeric(df[col], errors="coerce") / 60
-            break
-
-# Verificar coluna de tipo
-if "type" not in df.columns:
-    for col in ["sport_type", "type", "activity_type"]:
-        if col in df.columns:
-            df["type"] = df[col]
-            break
-
-# Remover linhas com dados essenciais faltando
-df = df.dropna(subset=['date'])
-if "distance_km" in df.columns:
-    df = df[df["distance_km"] > 0]
-if "duration_min" in df.columns:
-    df = df[df["duration_min"] > 0]
+# normalização das colunas (cacheada: não roda de novo a cada interação)
+df = _clean(df, date_col)
 
 if df.empty:
     st.error("❌ Nenhum dado válido após o processamento")
@@ -269,39 +556,30 @@ with st.sidebar:
     # start_date, end_date = st.date_input("Período", value=(min_date, max_date), key="filter_range")
 
     # filtros por ano / mês / dia
-    years = sorted(df["date"].dt.year.dropna().unique())
+    years = sorted(df["_year"].unique())
     year_options = ["Todos"] + [str(y) for y in years]
     selected_year = st.selectbox("Ano", options=year_options, index=0, key="sel_year")
 
-    months_present = sorted(df["date"].dt.month.dropna().unique())
-    month_map = {1:"Jan",2:"Fev",3:"Mar",4:"Abr",5:"Mai",6:"Jun",7:"Jul",8:"Ago",9:"Set",10:"Out",11:"Nov",12:"Dez"}
-    month_options = ["Todos"] + [f"{m:02d} - {month_map.get(m,str(m))}" for m in months_present]
+    months_present = sorted(df["_month"].unique())
+    month_options = ["Todos"] + [f"{m:02d} - {_MONTH_MAP.get(m,str(m))}" for m in months_present]
     selected_month_raw = st.selectbox("Mês", options=month_options, index=0, key="sel_month")
 
-    days_present = sorted(df["date"].dt.day.dropna().unique())
+    days_present = sorted(df["_day"].unique())
     day_options = ["Todos"] + [str(int(d)) for d in days_present]
     selected_day = st.selectbox("Dia", options=day_options, index=0, key="sel_day")
 
 # >>> NOVO: aplicar filtros (sem período) imediatamente após o sidebar
 # cria df_filtered padrão para evitar NameError (pode ser modificado pelos filtros abaixo)
-df_filtered = df.copy()
+df_filtered = df
 
 try:
-    # aplicar filtro por ano
-    if selected_year != "Todos":
-        df_filtered = df_filtered[df_filtered["date"].dt.year == int(selected_year)]
-
-    # aplicar filtro por mês (selected_month_raw no formato "MM - Nome" ou "Todos")
-    if selected_month_raw != "Todos":
-        month_num = int(selected_month_raw.split(" - ")[0])
-        df_filtered = df_filtered[df_filtered["date"].dt.month == month_num]
-
-    # aplicar filtro por dia
-    if selected_day != "Todos":
-        df_filtered = df_filtered[df_filtered["date"].dt.day == int(selected_day)]
-except Exception:
-    # em caso de qualquer problema, mantém df_filtered original
-    df_filtered = df.copy()
+    year_num = int(selected_year) if selected_year != "Todos" else None
+    month_num = int(selected_month_raw.split(" - ")[0]) if selected_month_raw != "Todos" else None
+    day_num = int(selected_day) if selected_day != "Todos" else None
+    df_filtered = _apply_date_filters(df, year_num, month_num, day_num)
+except ValueError:
+    # seleção que não converte para número: mantém df_filtered original
+    df_filtered = df
 
 # === KPIs NO CORPO PRINCIPAL (primeiros, centralizados) ===
 st.markdown("")  # espaço mínimo abaixo do título
@@ -323,34 +601,34 @@ def render_kpis(df_kpi):
         return
 
     total_acts = len(df_kpi)
-    total_dist = round(df_kpi["distance_km"].sum(), 1) if "distance_km" in df_kpi.columns else 0
-    total_dur_hours = round(df_kpi["duration_min"].sum() / 60, 1) if "duration_min" in df_kpi.columns else 0
+
+    # distância e duração somadas numa única redução sobre o bloco das duas colunas
+    measure_cols = [c for c in ("distance_km", "duration_min") if c in df_kpi.columns]
+    sums = dict(zip(measure_cols, df_kpi[measure_cols].to_numpy(dtype=np.float64).sum(axis=0)))
+    dist_sum = float(sums.get("distance_km", 0.0))
+    dur_sum = float(sums.get("duration_min", 0.0))
+    total_dist = round(dist_sum, 1)
+    total_dur_hours = round(dur_sum / 60, 1)
 
     # tratar datas com segurança (evita .strftime() sobre NaT)
     first_date = ""
     last_date = ""
     try:
         if "date" in df_kpi.columns:
-            # remove NaT antes de pegar min/max
-            valid_dates = df_kpi["date"].dropna()
-            if not valid_dates.empty:
-                fd = valid_dates.min()
-                ld = valid_dates.max()
-                if pd.notna(fd):
-                    first_date = pd.to_datetime(fd).strftime('%Y-%m-%d')
-                if pd.notna(ld):
-                    last_date = pd.to_datetime(ld).strftime('%Y-%m-%d')
+            # min/max num único .agg (NaT é ignorado)
+            fd, ld = df_kpi["date"].agg(["min", "max"])
+            if pd.notna(fd):
+                first_date = pd.to_datetime(fd).strftime('%Y-%m-%d')
+            if pd.notna(ld):
+                last_date = pd.to_datetime(ld).strftime('%Y-%m-%d')
     except Exception:
         first_date = ""
         last_date = ""
 
-    # calcular pace médio (min/km) como duração total / distância total com proteção
+    # pace médio (min/km) = duração total / distância total, reaproveitando as somas acima
     avg_pace = None
-    try:
-        if ("duration_min" in df_kpi.columns) and ("distance_km" in df_kpi.columns) and df_kpi["distance_km"].sum() > 0:
-            avg_pace = round(df_kpi["duration_min"].sum() / df_kpi["distance_km"].sum(), 1)
-    except Exception:
-        avg_pace = None
+    if "duration_min" in sums and dist_sum > 0:
+        avg_pace = round(dur_sum / dist_sum, 1)
 
     with cols[0]:
         st.metric("Total Atividades", f"{total_acts}")
@@ -367,11 +645,11 @@ if 'apply_filters' in locals() and apply_filters:
     df_filtered = df.copy()
     try:
         if selected_year != "Todos":
-            df_filtered = df_filtered[df_filtered["date"].dt.year == int(selected_year)]
+            df_filtered = df_filtered[df_filtered["_year"] == int(selected_year)]
         if selected_month != "Todos":
-            df_filtered = df_filtered[df_filtered["date"].dt.month == int(selected_month)]
+            df_filtered = df_filtered[df_filtered["_month"] == int(selected_month)]
         if selected_day != "Todos":
-            df_filtered = df_filtered[df_filtered["date"].dt.day == int(selected_day)]
+            df_filtered = df_filtered[df_filtered["_day"] == int(selected_day)]
     except Exception:
         # em caso de qualquer problema, mantém df_filtered original
         df_filtered = df.copy()
@@ -382,104 +660,71 @@ render_kpis(df_filtered)
 # === GRÁFICOS ===
 st.subheader("🏃 Resumo Geral")
 
-# helper para remover emoji no título da figura (caso venham de etl.py)
-def remove_emoji_from_fig_title(fig):
-    try:
-        title_text = fig.layout.title.text
-        if title_text:
-            # remove o emoji de corrida se existir e retira espaços iniciais
-            new_title = title_text.replace("🏃", "").lstrip()
-            fig.update_layout(title_text=new_title)
-    except Exception:
-        pass
-    return fig
+# fragmento: trocar de aba reexecuta só esta parte, não o script inteiro (filtros, KPIs, CSV)
+@st.fragment
+def render_charts(df_in):
+    # abas com execução preguiçosa (on_change="rerun"): só a aba aberta monta e envia seus gráficos
+    tab_overview, tab_monthly, tab_category = st.tabs(
+        ["Visão geral", "Mensal", "Categoria"], key="chart_tab", on_change="rerun"
+    )
 
-with st.spinner("Gerando gráficos..."):
-    col1, col2 = st.columns(2, gap="large")
-    
-    with col1:
-        fig1 = create_distance_over_time(df_filtered)
-        if fig1:
-            fig1 = remove_emoji_from_fig_title(fig1)
-            fig1.update_layout(title_text="🏃 Distância acumulada")    # título com ícone
-            fig1.update_traces(marker_color="#FC4C02", line_color="#FC4C02")
-            fig1.update_layout(xaxis_title=None)
-            fig1.update_layout(margin=dict(t=40, b=60, l=40, r=20), height=420)
-            st.plotly_chart(fig1, use_container_width=True)
-
-        fig3 = create_pace_trend(df_filtered)
-        if fig3:
-            fig3 = remove_emoji_from_fig_title(fig3)
-            fig3.update_layout(title_text="🏃 Tendência de pace")    # título com ícone
-            fig3.update_traces(marker_color="#FC4C02", line_color="#FC4C02")
-            fig3.update_layout(xaxis_title=None)
-            fig3.update_layout(margin=dict(t=40, b=60, l=40, r=20), height=420)
-            st.plotly_chart(fig3, use_container_width=True)
-
-    with col2:
-        fig2 = create_activity_type_pie(df_filtered)
-        if fig2:
-            fig2 = remove_emoji_from_fig_title(fig2)
-            fig2.update_layout(title_text="🏃 Tipos de atividade")    # título com ícone
-
-            color_map = {
-                "Run": "#FC4C02",
-                "Walk": "#2ca02c",
-                "Ride": "#1f77b4",
-            }
-            try:
-                labels = list(fig2.data[0].labels)
-                colors = [color_map.get(lbl, "#A0522D") for lbl in labels]
-                fig2.update_traces(marker=dict(colors=colors))
-            except Exception:
-                fig2.update_traces(marker=dict(colors=["#FC4C02", "#2ca02c", "#1f77b4", "#A0522D"]))
-
-            fig2.update_layout(xaxis_title=None)
-            fig2.update_layout(margin=dict(t=40, b=60, l=40, r=20), height=420)
-            st.plotly_chart(fig2, use_container_width=True)
-
-        fig_km = total_runs_by_km(df_filtered)
-        if fig_km:
-            fig_km = remove_emoji_from_fig_title(fig_km)
-            fig_km.update_layout(title_text="🏃 Distribuição por distância")   # título com ícone
-            fig_km.update_layout(xaxis_title=None)
-            fig_km.update_layout(margin=dict(t=40, b=60, l=40, r=20), height=460)
-            fig_km.update_yaxes(automargin=True)
-            st.plotly_chart(fig_km, use_container_width=True)
-
-    fig_monthly = create_monthly_stats(df_filtered)
-    if fig_monthly:
-        fig_monthly = remove_emoji_from_fig_title(fig_monthly)
-        # manter título ou ajustar se quiser; aqui removemos apenas o eixo Y
-        fig_monthly.update_layout(title_text="🏃 Total distância")
-        # esconder todo o eixo Y (linhas, ticks e labels)
-        fig_monthly.update_yaxes(visible=False)
-        fig_monthly.update_traces(marker_color="#FC4C02")
-        fig_monthly.update_layout(xaxis_title=None)
-        fig_monthly.update_layout(margin=dict(t=70, b=100, l=40, r=20), height=540)
-        fig_monthly.update_layout(uniformtext_minsize=8, uniformtext_mode='show')
-        st.plotly_chart(fig_monthly, use_container_width=True)
-
-    fig_cat = pace_by_category(df_filtered)
-    if fig_cat:
-        fig_cat = remove_emoji_from_fig_title(fig_cat)
-        # manter título ou ajustar se quiser; aqui removemos apenas o eixo Y
-        fig_cat.update_layout(title_text="🏃 Pace médio por categoria")
-        # esconder todo o eixo Y (linhas, ticks e labels)
-        fig_cat.update_yaxes(visible=False)
-        fig_cat.update_traces(marker_color="#FC4C02")
-        fig_cat.update_layout(xaxis_title=None)
-        fig_cat.update_layout(margin=dict(t=70, b=100, l=40, r=20), height=540)
-        fig_cat.update_layout(uniformtext_minsize=8, uniformtext_mode='show')
-        st.plotly_chart(fig_cat, use_container_width=True)
+    with st.spinner("Gerando gráficos..."):
+        # figuras já chegam estilizadas (dict) dos wrappers cacheados
+        if tab_overview.open:
+            with tab_overview:
+                # as quatro figuras são montadas em paralelo e exibidas na ordem do layout
+                with ThreadPoolExecutor(max_workers=4) as executor:
+                    fig1, fig3, fig2, fig_km = executor.map(
+                        lambda build: build(df_in),
+                        [_cached_distance_over_time, _cached_pace_trend, _cached_activity_type_pie, _cached_runs_by_km],
+                    )
+
+                col1, col2 = st.columns(2, gap="large")
+
+                with col1:
+                    if fig1:
+                        st.plotly_chart(fig1, width="stretch")
+
+                    if fig3:
+                        st.plotly_chart(fig3, width="stretch")
+
+                with col2:
+                    if fig2:
+                        st.plotly_chart(fig2, width="stretch")
+
+                    if fig_km:
+                        st.plotly_chart(fig_km, width="stretch")
+
+        # barras simples em Vega-Lite (Altair): sem o pipeline de validação do Plotly
+        if tab_monthly.open:
+            with tab_monthly:
+                monthly = _cached_monthly_distance(df_in)
+                if monthly is not None:
+                    st.altair_chart(labeled_bar_chart(monthly, "month_year", "distance_km", "🏃 Total distância"),
+                                    width="stretch")
+
+        if tab_category.open:
+            with tab_category:
+                cat_pace = _cached_pace_by_category(df_in)
+                if cat_pace is not None:
+                    st.altair_chart(labeled_bar_chart(cat_pace, "category", "pace_min_km", "🏃 Pace médio por categoria"),
+                                    width="stretch")
+
+# filtros sem nenhuma atividade: uma mensagem só, sem montar abas nem gráficos
+if df_filtered.empty:
+    st.info("Sem dados para os filtros selecionados.")
+else:
+    render_charts(df_filtered)
 
 # Download
 if not df_filtered.empty:
-    csv_bytes = df_filtered.to_csv(index=False).encode("utf-8")
-    st.download_button("Baixar CSV", data=csv_bytes, file_name="activities.csv", mime="text/csv")
+    # callable: o CSV só é gerado quando o usuário clica (e fica em cache por seleção);
+    # on_click="ignore": o clique só baixa o arquivo, sem reexecutar o script (nem os gráficos)
+    st.download_button("Baixar CSV", data=functools.partial(_csv_bytes, df_filtered),
+                       file_name="activities.csv", mime="text/csv", on_click="ignore")
 
 if not df.empty:
-    st.write("Período total:", df["date"].min().strftime('%Y-%m-%d'), "→", df["date"].max().strftime('%Y-%m-%d'))
+    st.write("Período total:", df.attrs["date_min"], "→", df.attrs["date_max"])
 
 # === ARQUIVO .gitignore SUGERIDO ===
 """
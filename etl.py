@@ -1,5 +1,6 @@
 import requests
 import pandas as pd
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
@@ -151,11 +152,13 @@ def create_distance_over_time(df: pd.DataFrame):
     """Gráfico de distância acumulada ao longo do tempo"""
     if df.empty:
         return None
-    df_sorted = df.sort_values("date")
-    df_sorted["cumulative_distance"] = df_sorted["distance_km"].cumsum()
-    fig = px.line(df_sorted, x="date", y="cumulative_distance", markers=True,
+    # ordenação + soma acumulada direto nos arrays (sem criar Series intermediárias)
+    dates = pd.DatetimeIndex(df["date"])
+    order = np.argsort(dates.asi8, kind="stable")
+    cumulative = np.cumsum(df["distance_km"].to_numpy(dtype=np.float64)[order])
+    fig = px.line(x=dates[order], y=cumulative, markers=True,
                   title=" Distância Acumulada", 
-                  labels={"cumulative_distance":"Distância (km)","date":"Data"})
+                  labels={"y":"Distância (km)","x":"Data"})
     # remover título do eixo X de forma confiável
     fig.update_xaxes(title_text="")
     return fig
@@ -164,11 +167,12 @@ def create_activity_type_pie(df: pd.DataFrame):
     """Pizza com tipos de atividade"""
     if df.empty:
         return None
-    counts = df["type"].value_counts().reset_index()
+    counts = df["type"].value_counts()
+    # com "type" categórico, value_counts inclui tipos ausentes no filtro
+    counts = counts[counts > 0].reset_index()
     counts.columns = ["type", "count"]
     fig = px.pie(counts, names="type", values="count", 
                  title=" Distribuição por Tipo de Atividade")
-    fig.update_xaxes(title_text="")
     return fig
 
 def create_pace_trend(df: pd.DataFrame):